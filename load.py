@@ -1,6 +1,8 @@
+import os
 import sqlite3
-import pandas as pd
 import logging
+import numpy as np
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
@@ -10,16 +12,39 @@ class WorldCupLoader:
     Charge uniquement la table principale des matchs du tournoi.
     """
     
-    def __init__(self, db_path="data/worldcup.db"):
+    # Colonnes de la table world_cup_matches, dans l'ordre du schéma
+    TABLE_COLUMNS = ['id_match', 'home_team', 'away_team', 'home_result', 'away_result',
+                     'result', 'date', 'round', 'city', 'edition']
+    
+    def __init__(self, db_path="data/worldcup.db", batch_size=10_000, in_memory=False):
         self.db_path = db_path
+        # Nombre de lignes par transaction lors des insertions (ajustable selon l'environnement)
+        self.batch_size = batch_size
+        # Option : base reconstruite en mémoire puis écrite d'un bloc dans db_path par persist()
+        # (sans appel à persist(), rien n'est écrit sur disque)
+        self.in_memory = in_memory
         self.conn = None
     
     # Établit la connexion SQLite pour accès par nom de colonne
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            # Cache de requêtes préparées élargi : les INSERT et requêtes de vérification sont réutilisés
+            self.conn = sqlite3.connect(":memory:" if self.in_memory else self.db_path, cached_statements=256)
             self.conn.row_factory = sqlite3.Row
-            logger.info(f"Connexion à {self.db_path} établie")
+            # Réglages orientés ingestion : tables temporaires et cache en mémoire
+            self.conn.executescript("""
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            """)
+            # Base sur disque uniquement : journal WAL, fsync allégé, mmap (sans objet pour :memory:)
+            if not self.in_memory:
+                self.conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA mmap_size=268435456;
+                PRAGMA busy_timeout=5000;
+                """)
+            logger.info(f"Connexion à {':memory:' if self.in_memory else self.db_path} établie")
         except Exception as e:
             logger.error(f"Erreur connexion DB: {e}")
             raise
@@ -29,6 +54,7 @@ class WorldCupLoader:
         """Création du schéma simplifié (Une seule table)."""
         logger.info("Création du schéma simplifié...")
         sql = """
+        DROP VIEW IF EXISTS v_matches;
         DROP TABLE IF EXISTS world_cup_matches;
         DROP TABLE IF EXISTS stadiums;     -- On nettoie les anciennes tables si elles existent
         DROP TABLE IF EXISTS teams;
@@ -41,15 +67,15 @@ class WorldCupLoader:
             home_result INTEGER NOT NULL,
             away_result INTEGER NOT NULL, 
             result TEXT,
-            date DATE NOT NULL,
+            date INTEGER NOT NULL,  -- jours depuis le 01/01/1970 (voir v_matches pour la forme ISO)
             round TEXT NOT NULL,
             city TEXT NOT NULL,
             edition TEXT NOT NULL
         );
         
-        -- Index pour la performance des requêtes courantes
-        CREATE INDEX idx_edition ON world_cup_matches(edition);
-        CREATE INDEX idx_teams ON world_cup_matches(home_team, away_team);
+        -- Vue de lecture pour la BI : date restituée au format ISO 'YYYY-MM-DD'
+        CREATE VIEW v_matches AS
+        SELECT *, date(date * 86400, 'unixepoch') AS date_iso FROM world_cup_matches;
         """
         try:
             self.conn.executescript(sql)
@@ -59,41 +85,131 @@ class WorldCupLoader:
             logger.error(f"Erreur création schéma: {e}")
             raise
     
-    # Insère les données du DataFrame dans la table avec formatage dates SQLite
+    # Crée les index une fois les données chargées (évite la maintenance des B-trees à chaque insertion)
+    def create_indexes(self):
+        """Création des index après le chargement en masse."""
+        logger.info("Création des index...")
+        sql = """
+        -- Index pour la performance des requêtes courantes
+        CREATE INDEX IF NOT EXISTS idx_edition ON world_cup_matches(edition);
+        CREATE INDEX IF NOT EXISTS idx_teams ON world_cup_matches(home_team, away_team);
+        """
+        try:
+            self.conn.executescript(sql)
+            self.conn.commit()
+            logger.info("Index créés.")
+        except Exception as e:
+            logger.error(f"Erreur création index: {e}")
+            raise
+
+    # Convertit une colonne en valeurs Python natives acceptées par sqlite3
+    @staticmethod
+    def _column_values(series):
+        """NA → NULL, catégories → str, entiers numpy/nullables → int."""
+        return series.astype(object).where(series.notna(), None).to_numpy()
+
+    # Convertit une colonne datetime en nombre de jours depuis l'epoch (entier, comparaisons et index plus compacts)
+    @staticmethod
+    def _unix_days(series):
+        days = series.to_numpy(dtype='datetime64[D]')
+        out = days.astype(np.int64).astype(object)
+        out[np.isnat(days)] = None
+        return out
+
+    # Insère des colonnes déjà converties dans une table via INSERT paramétré (chemin commun à toute table)
+    def _insert_rows(self, table, columns, arrays, n_rows):
+        """Insertion positionnelle par lots de batch_size lignes, une transaction par lot."""
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        # Une transaction par lot : ni autocommit ligne à ligne, ni transaction géante
+        rows = zip(*arrays)
+        # Un seul curseur pour tous les lots : l'INSERT est préparé une fois puis réutilisé
+        cur = self.conn.cursor()
+        for _ in range(0, n_rows, self.batch_size):
+            cur.execute("BEGIN IMMEDIATE")
+            cur.executemany(sql, islice(rows, self.batch_size))
+            self.conn.commit()
+        cur.close()
+
+    # Insère les données du DataFrame dans la table avec dates en jours depuis l'epoch
     def load_data(self, df):
         """Chargement des données dans la table unique."""
         logger.info(f"Chargement de {len(df)} matchs...")
         try:
-            df_load = df.copy()
-            # Formatage Date pour SQLite
-            df_load['date'] = df_load['date'].dt.strftime('%Y-%m-%d')
-            
-            # Insertion directe (les colonnes du DF correspondent maintenant exactement à la table)
-            df_load.to_sql('world_cup_matches', self.conn, if_exists='append', index=False)
+            # Alignement sur les colonnes de la table en un seul reindex (colonnes absentes → NULL, surplus ignoré)
+            columns = self.TABLE_COLUMNS
+            df = df.reindex(columns=columns, copy=False)
+            # Conversion colonne par colonne (pas de copie du DataFrame complet), Date en jours depuis l'epoch
+            arrays = [
+                self._unix_days(df[c]) if c == 'date' else self._column_values(df[c])
+                for c in columns
+            ]
             
-            self.conn.commit()
+            # Pas de checkpoint WAL automatique pendant l'insertion en masse (voir checkpoint())
+            if not self.in_memory:
+                self.conn.execute("PRAGMA wal_autocheckpoint=0")
+            # Insertion directe (colonnes alignées sur la table)
+            self._insert_rows('world_cup_matches', columns, arrays, len(df))
             logger.info("Données chargées avec succès.")
         except Exception as e:
             logger.error(f"Erreur chargement: {e}")
             self.conn.rollback()
             raise
     
+    # Rapatrie le WAL dans la base en une fois après le chargement, puis rétablit le checkpoint automatique
+    def checkpoint(self):
+        """Checkpoint manuel unique (TRUNCATE) après chargement et indexation (base sur disque)."""
+        if self.in_memory:
+            return
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("PRAGMA wal_autocheckpoint=1000")
+            logger.info("Checkpoint WAL effectué.")
+        except Exception as e:
+            logger.error(f"Erreur checkpoint WAL: {e}")
+            raise
+
+    # Écrit la base construite en mémoire dans db_path (copie compacte, remplacement atomique de l'ancien fichier)
+    def persist(self):
+        """Matérialisation de la base en mémoire via VACUUM INTO."""
+        if not self.in_memory:
+            return
+        tmp_path = f"{self.db_path}.tmp"
+        try:
+            # VACUUM INTO refuse d'écraser un fichier existant
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # Statistiques du planificateur calculées avant la copie (sqlite_stat1 est copiée avec la base)
+            self.conn.execute("ANALYZE")
+            self.conn.execute("VACUUM INTO ?", (tmp_path,))
+            # Journaux WAL/SHM d'une ancienne base sur disque : invalides pour le nouveau fichier
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
+            os.replace(tmp_path, self.db_path)
+            logger.info(f"Base écrite dans {self.db_path}")
+        except Exception as e:
+            logger.error(f"Erreur écriture de la base: {e}")
+            raise
+
     # Vérifie le nombre de matchs chargés et affiche les phases présentes
     def verify_load(self):
         """Vérification simple."""
         try:
-            count = pd.read_sql_query("SELECT COUNT(*) as t FROM world_cup_matches", self.conn)['t'][0]
+            count = self.conn.execute("SELECT COUNT(*) FROM world_cup_matches").fetchone()[0]
             logger.info(f"Base de données finalisée : {count} matchs enregistrés.")
             
             # Petit check pour voir si on a bien viré les préliminaires
-          # rounds = pd.read_sql_query("SELECT DISTINCT round FROM world_cup_matches", self.conn)
-          # logger.info(f" Phases présentes : {rounds['round'].tolist()}")
+          # rounds = [r[0] for r in self.conn.execute("SELECT DISTINCT round FROM world_cup_matches")]
+          # logger.info(f" Phases présentes : {rounds}")
             
         except Exception as e:
             logger.error(f"Erreur vérification: {e}")
 
-    # Ferme proprement la connexion à la base de données
+    # Ferme proprement la connexion à la base de données (statistiques du planificateur mises à jour avant)
     def close(self):
         if self.conn:
+            # Base en mémoire : statistiques déjà calculées et copiées par persist()
+            if not self.in_memory:
+                self.conn.execute("PRAGMA optimize")
             self.conn.close()
             logger.info("Connexion fermée")
\ No newline at end of file
@@ -5,13 +5,63 @@ Pipeline complet : Extract -> Transform -> Load
 Ce script agit comme le point d'entrée (Orchestrateur) du projet.
 Il coordonne les interactions entre les modules d'extraction, de transformation et de chargement.
 """
+import hashlib
 import logging
 from pathlib import Path
+import pandas as pd
 from config import setup_logging
 from extract import WorldCupExtractor
 from transform import WorldCupTransformer
 from load import WorldCupLoader
 
+# Répertoire du cache des sources nettoyées (le supprimer pour forcer une ré-extraction complète)
+CACHE_DIR = Path("data/cache")
+# Code dont dépend le contenu du cache : toute modification des règles ou des mappings l'invalide
+CACHE_DEPENDENCIES = ("extract.py", "transform.py", "config.py")
+
+# Empreinte courte du code d'extraction, de transformation et des mappings (intégrée au nom des fichiers de cache)
+def code_version():
+    digest = hashlib.sha256()
+    for name in CACHE_DEPENDENCIES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()[:12]
+
+# Relit depuis le cache Parquet le résultat d'une source s'il est plus récent que le fichier brut, sinon le recalcule
+def cached(name, raw_path, fn):
+    """
+    Cache Parquet par source, invalidé par la date de modification du fichier brut
+    et par l'empreinte du code d'extraction et de transformation (extract.py, transform.py, config.py).
+    """
+    logger = logging.getLogger(__name__)
+    cache_path = CACHE_DIR / f"{name}-{code_version()}.parquet"
+    raw_path = Path(raw_path)
+    if cache_path.exists() and raw_path.exists() and cache_path.stat().st_mtime >= raw_path.stat().st_mtime:
+        logger.info(f"Cache Parquet utilisé pour {name}")
+        return pd.read_parquet(cache_path)
+    
+    df = fn()
+    if df is not None:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Caches produits par une version précédente du code : devenus invalides
+            for stale in CACHE_DIR.glob(f"{name}-*.parquet"):
+                stale.unlink()
+            df.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            # Le cache n'est qu'une optimisation : un échec d'écriture ne bloque pas le pipeline
+            logger.warning(f"Cache Parquet non écrit pour {name}: {e}")
+    return df
+
+# Chaîne extraction + transformation d'une source
+def extract_and_transform(extract_fn, filename, transform_fn, data_dir="data/raw"):
+    """
+    Lit la source brute puis la nettoie (ou relit le résultat depuis le cache Parquet).
+    transform_fn doit rester sans état : quand le cache est utilisé elle n'est pas appelée,
+    tout ce qu'elle produit doit donc se trouver dans le DataFrame retourné.
+    """
+    raw_path = Path(data_dir) / filename
+    return cached(Path(filename).stem, raw_path, lambda: transform_fn(extract_fn(filename)))
+
 def run_etl_pipeline():
     """
     Fonction principale d'orchestration.
@@ -32,11 +82,7 @@ def run_etl_pipeline():
         # =====================================================================
         extractor = WorldCupExtractor(data_dir="data/raw")
         
-        # Chargement des datasets bruts en mémoire (DataFrames)
-        df1 = extractor.extract_source1("matches_1930-2010.csv")
-        df2 = extractor.extract_source2("WorldCupMatches2014.csv")
-        df3 = extractor.extract_source3("Fifa_world_cup_matches.csv")
-        json4 = extractor.extract_source4("data_2018.json")
+        # Chargement des fichiers de référence (petits, lus directement)
         dates_1930_2010 = extractor.extract_historical_dates("dates_1930_2010.txt")
         
         # Chargement du fichier de référence pour la correction des villes 2022
@@ -48,13 +94,19 @@ def run_etl_pipeline():
         # =====================================================================
         transformer = WorldCupTransformer()
         
-        # Transformation unitaire de chaque source (Parsing dates, scores, noms)
-        df_c1 = transformer.transform_source1(df1)
+        # Extraction + transformation unitaire de chaque source (Parsing dates, scores, noms)
+        # Exécution séquentielle : sur ~7 700 lignes, un pool de processus coûte plus cher (démarrage,
+        # sérialisation des DataFrames) que le traitement lui-même, et les logs restent dans ce processus
+        sources = [
+            (extractor.extract_source1, "matches_1930-2010.csv", transformer.transform_source1),
+            (extractor.extract_source2, "WorldCupMatches2014.csv", transformer.transform_source2),
+            (extractor.extract_source3, "Fifa_world_cup_matches.csv", transformer.transform_source3),
+            (extractor.extract_source4, "data_2018.json", transformer.transform_source4),
+        ]
+        df_c1, df_c2, df_c3, df_c4 = [extract_and_transform(*src, extractor.data_dir) for src in sources]
+
         if dates_1930_2010 is not None:
             df_c1 = transformer.enrich_with_historical_dates(df_c1, dates_1930_2010)
-        df_c2 = transformer.transform_source2(df2)
-        df_c3 = transformer.transform_source3(df3)
-        df_c4 = transformer.transform_source4(json4)
 
         # Application des règles métier spécifiques (Enrichissement)
         # 1. Correction des villes 2022 via jointure externe
@@ -84,7 +136,8 @@ def run_etl_pipeline():
         # PHASE 3 : CHARGEMENT (Load)
         # Persistance des données nettoyées dans le Data Warehouse (SQLite)
         # =====================================================================
-        loader = WorldCupLoader(db_path="data/worldcup.db")
+        # Base construite en mémoire (écrite dans db_path par persist() après vérification)
+        loader = WorldCupLoader(db_path="data/worldcup.db", in_memory=True)
         loader.connect()
         
         # Réinitialisation du schéma (DDL)
@@ -93,8 +146,13 @@ def run_etl_pipeline():
         # Insertion des données (DML)
         loader.load_data(df_final)             # Table de faits (Matchs)
         
+        # Index créés après l'insertion en masse
+        loader.create_indexes()
+        
         # Vérification finale post-chargement
         loader.verify_load()
+        # Base construite en mémoire : écriture du fichier final en une passe
+        loader.persist()
         loader.close()
         
         # Export Flat File (CSV) pour audit ou usage BI léger
@@ -0,0 +1,63 @@
+"""
+Tests du module de chargement SQLite.
+Lancement depuis la racine du projet : python -m unittest discover tests
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+from load import WorldCupLoader
+
+
+class LoadRoundTripTest(unittest.TestCase):
+
+    # Frame au format de sortie de consolidate : catégories, scores Int8, résultat manquant
+    def _frame(self):
+        df = pd.DataFrame({
+            'id_match': pd.array([1, 2, 3], dtype='int32'),
+            'home_team': ['France', 'Italy', 'Brazil'],
+            'away_team': ['Brazil', 'Chile', 'Sweden'],
+            'home_result': pd.array([3, 1, 5], dtype='Int8'),
+            'away_result': pd.array([0, 1, 2], dtype='Int8'),
+            'result': ['France', 'draw', None],
+            'date': pd.to_datetime(['1998-07-12', '1998-06-23', '1958-06-29']),
+            'round': ['Final', 'Group Stage', 'Final'],
+            'city': ['Saint-Denis', 'Bordeaux', 'Solna'],
+            'edition': ['1998', '1998', '1958'],
+        })
+        return df.astype({c: 'category' for c in ['home_team', 'away_team', 'result', 'round', 'city', 'edition']})
+
+    # Base construite en mémoire, écrite par persist() puis relue via la vue v_matches
+    def test_in_memory_persist_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'worldcup.db')
+            loader = WorldCupLoader(db_path=db_path, batch_size=2, in_memory=True)
+            loader.connect()
+            loader.create_schema()
+            loader.load_data(self._frame())
+            loader.create_indexes()
+            loader.persist()
+            loader.close()
+
+            conn = sqlite3.connect(db_path)
+            try:
+                rows = conn.execute("""
+                    SELECT id_match, home_team, away_team, home_result, away_result, result,
+                           typeof(date), date_iso, round, city, edition
+                    FROM v_matches ORDER BY id_match
+                """).fetchall()
+            finally:
+                conn.close()
+
+        self.assertEqual(rows, [
+            (1, 'France', 'Brazil', 3, 0, 'France', 'integer', '1998-07-12', 'Final', 'Saint-Denis', '1998'),
+            (2, 'Italy', 'Chile', 1, 1, 'draw', 'integer', '1998-06-23', 'Group Stage', 'Bordeaux', '1998'),
+            (3, 'Brazil', 'Sweden', 5, 2, None, 'integer', '1958-06-29', 'Final', 'Solna', '1958'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
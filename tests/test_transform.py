@@ -0,0 +1,141 @@
+"""
+Tests de non-régression du module de transformation.
+Lancement depuis la racine du projet : python -m unittest discover tests
+"""
+import unittest
+
+import pandas as pd
+
+from transform import WorldCupTransformer
+
+
+class MapTeamsTest(unittest.TestCase):
+
+    # Version colonne identique à normalize_team (lookup exact, pas de correspondance insensible à la casse)
+    def test_matches_scalar_normalize_team(self):
+        transformer = WorldCupTransformer()
+        names = ['us', 'USA', 'germany', 'Argentina (ARG)', '12', None]
+
+        mapped = transformer._map_teams(pd.Series(names, dtype=object)).tolist()
+
+        self.assertEqual(mapped, [transformer.normalize_team(n) for n in names])
+
+
+class EnrichHistoricalDatesTest(unittest.TestCase):
+
+    # Phases en category (sortie de transform_source1) toutes connues de round_order_map : pas de TypeError
+    def test_categorical_rounds_with_repeated_pair(self):
+        matches = pd.DataFrame({
+            'home_team': ['Brazil', 'Brazil'],
+            'away_team': ['Sweden', 'Sweden'],
+            'edition': ['1958', '1958'],
+            'date': pd.to_datetime(['1958-07-01', '1958-07-01']),
+            'round': ['Group Stage', 'Final'],
+        }).astype({'home_team': 'category', 'away_team': 'category', 'round': 'category'})
+        dates = pd.DataFrame({
+            'home_team': ['Brazil', 'Brazil'],
+            'away_team': ['Sweden', 'Sweden'],
+            'date_exacte': ['08/06/1958', '29/06/1958'],
+        })
+
+        result = WorldCupTransformer().enrich_with_historical_dates(matches, dates)
+
+        self.assertEqual(len(result), 2)
+        self.assertTrue(result['date'].notna().all())
+
+
+class TransformSource3Test(unittest.TestCase):
+
+    # Mêmes dates que le parsing ligne à ligne d'origine : heure ignorée après " - ", "Mon JJ, AAAA" non reconnu
+    def test_date_rules_match_scalar_parser(self):
+        values = ['20NOV22', '18 DEC 2022 - 17:00', 'Nov 20, 2022', '2022-11-25', None]
+        df = pd.DataFrame({
+            'team1': ['France'] * len(values), 'team2': ['Brazil'] * len(values),
+            'number of goals team1': 1, 'number of goals team2': 0, 'date': values,
+        })
+
+        dates = WorldCupTransformer().transform_source3(df)['date'].tolist()
+
+        self.assertEqual(dates, pd.to_datetime(
+            ['2022-11-20', '2022-12-18', '1900-01-01', '2022-11-25', '1900-01-01']).tolist())
+
+
+class TransformSource4Test(unittest.TestCase):
+
+    # Score null dans le JSON : pas de résultat ; clé absente : score 0 comme avant
+    def test_null_score_gives_no_result(self):
+        json_data = {
+            'stadiums': [{'id': 1, 'city': 'Moscow'}],
+            'groups': {'a': {'matches': [
+                {'home_team': 1, 'away_team': 2, 'home_result': None, 'away_result': 1, 'stadium': 1},
+                {'home_team': 3, 'away_team': 4, 'stadium': 1},
+            ]}},
+            'knockout': {},
+        }
+
+        df = WorldCupTransformer().transform_source4(json_data)
+
+        self.assertTrue(pd.isna(df['home_result'].iloc[0]))
+        self.assertIsNone(df['result'].iloc[0])
+        self.assertEqual(df['result'].iloc[1], 'draw')
+
+
+class ConsolidateTest(unittest.TestCase):
+
+    COLUMNS = ['home_team', 'away_team', 'home_result', 'away_result', 'result', 'date', 'round', 'city', 'edition']
+
+    def setUp(self):
+        self.transformer = WorldCupTransformer()
+
+    # DataFrame au format de sortie des transform_source* (colonnes texte en catégories)
+    def _frame(self, rows):
+        return self.transformer._to_categories(pd.DataFrame(rows, columns=self.COLUMNS))
+
+    def _consolidate(self):
+        source_a = self._frame([
+            ['France', 'Brazil', 2, 1, 'France', pd.Timestamp('1998-07-12'), 'Final', 'Saint-Denis', '1998'],
+            ['Italy', 'Chile', 1, 1, 'draw', pd.NaT, 'Group Stage', 'Rome', 'Unknown'],
+            ['Mexico', 'USA', 3, 0, 'Mexico', pd.Timestamp('1998-06-10'), 'Preliminary Round', 'Mexico', '1998'],
+            ['Norway', 'Scotland', 1, 1, 'draw', pd.Timestamp('1998-06-01'), 'Group Stage', 'Bordeaux', '1998'],
+        ])
+        source_b = self._frame([
+            ['France', 'Brazil', 0, 0, 'draw', pd.Timestamp('1998-07-12'), 'Final', 'Paris', '1998'],
+            ['Spain', 'Nigeria', 2, 3, 'Nigeria', pd.Timestamp('1998-06-01'), 'Group Stage', 'Nantes', '1998'],
+        ])
+        return self.transformer.consolidate([source_a, source_b])
+
+    # Doublon (équipes, date, phase) : la première ligne dans l'ordre des sources est conservée
+    def test_dedup_keeps_first_source_row(self):
+        final = self._consolidate()
+        finals = final[final['round'] == 'Final']
+        self.assertEqual(len(finals), 1)
+        self.assertEqual(finals['city'].iloc[0], 'Saint-Denis')
+        self.assertEqual(finals['home_result'].iloc[0], 2)
+
+    # Tri chronologique stable (ordre des sources à date égale), date introuvable (NaT) en dernier
+    def test_sort_order(self):
+        final = self._consolidate()
+        self.assertEqual(final['home_team'].tolist(), ['Norway', 'Spain', 'France', 'Italy'])
+        self.assertTrue(pd.isna(final['date'].iloc[-1]))
+        self.assertEqual(final['id_match'].tolist(), [1, 2, 3, 4])
+
+    # Phases "preliminary" exclues quelle que soit la casse
+    def test_preliminary_rounds_filtered(self):
+        final = self._consolidate()
+        self.assertNotIn('Mexico', final['home_team'].tolist())
+
+    def test_output_dtypes(self):
+        final = self._consolidate()
+        self.assertEqual(final.columns.tolist(), ['id_match'] + self.COLUMNS)
+        self.assertEqual(final['id_match'].dtype, 'int32')
+        self.assertEqual(str(final['home_result'].dtype), 'Int8')
+        self.assertEqual(str(final['away_result'].dtype), 'Int8')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(final['date']))
+        for c in ['home_team', 'away_team', 'result', 'round', 'city', 'edition']:
+            self.assertIsInstance(final[c].dtype, pd.CategoricalDtype, c)
+        # Équipes et résultat partagent leurs catégories (comparaisons sur les codes)
+        self.assertEqual(final['result'].dtype, final['home_team'].dtype)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,23 @@
 import pandas as pd
 import re
 import logging
+from pandas.api.types import union_categoricals
 from config import TEAMS_MAPPING, CITIES_MAPPING, ROUNDS_MAPPING, TEAMS_MAPPING_2018, STADIUMS_MAPPING_2018
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Expressions régulières compilées une seule fois au chargement du module
+# Score : les 2 premiers nombres séparés par un non-chiffre (ex: "3–2 (a.e.t.)")
+_SCORE_RE = re.compile(r'^(\d+)[^\d]+(\d+)')
+# Suffixe entre parenthèses des noms d'équipes (ex: "Argentina (ARG)")
+_TEAM_PAREN_RE = re.compile(r'\s*\(.*\)')
+# Parenthèses dans les noms de villes (ex: "Mexico (México)")
+_CITY_PAREN_RE = re.compile(r'\([^)]*\)')
+
+# Chaînes en mémoire Arrow (UTF-8 contigu) pour les nettoyages .str sur colonnes complètes
+_TEXT_DTYPE = 'string[pyarrow]'
+
 class WorldCupTransformer:
     """
     Module de Transformation ETL.
@@ -13,6 +25,9 @@ class WorldCupTransformer:
     provenant de sources hétérogènes.
     """
     
+    # Colonnes texte à faible cardinalité stockées en catégories dès la sortie de chaque source
+    CATEGORY_COLUMNS = ('home_team', 'away_team', 'city', 'round')
+    
     def __init__(self):
         self.teams_mapping = TEAMS_MAPPING
         self.cities_mapping = CITIES_MAPPING
@@ -39,9 +54,14 @@ class WorldCupTransformer:
                 except (ValueError, TypeError):
                     return None, None
 
+            # --- Cas courant "H-A" (ou "H–A", "H:A") : découpage simple, sans regex ---
+            parts = s.replace('–', '-').replace(':', '-').split('-')
+            if len(parts) == 2 and parts[0].isdecimal() and parts[1].isdecimal():
+                return int(parts[0]), int(parts[1])
+
             # --- REGEX UNIVERSELLE AMÉLIORÉE ---
             # Capture UNIQUEMENT les 2 premiers nombres séparés par un non-chiffre
-            match = re.search(r'^(\d+)[^\d]+(\d+)', s)
+            match = _SCORE_RE.search(s)
             
             if match:
                 home_score = int(match.group(1))
@@ -50,11 +70,11 @@ class WorldCupTransformer:
                 return home_score, away_score
             
             # Si la regex échoue, on log et on retourne None
-            logger.warning(f"Impossible de parser le score : '{s}'")
+            logger.warning("Impossible de parser le score : '%s'", s)
             return None, None
 
         except Exception as e:
-            logger.error(f"Erreur parsing score '{score_str}': {e}")
+            logger.error("Erreur parsing score '%s': %s", score_str, e)
             return None, None
 
     # Standardise les noms d'équipes selon mappings définis (encodage, synonymes)
@@ -70,7 +90,7 @@ class WorldCupTransformer:
         if team.isdigit(): return "Unknown"
         
         # Nettoyage syntaxique
-        team = re.sub(r'\s*\(.*\)', '', team)
+        team = _TEAM_PAREN_RE.sub('', team)
         team = team.replace('"', '').strip()
         
         # Gestion spécifique encodage
@@ -92,16 +112,80 @@ class WorldCupTransformer:
             
         return team.title()
 
+    # Prépare une colonne texte pour les normaliseurs vectorisés : (masque NA, str(valeur) sans espaces)
+    @staticmethod
+    def _as_text(s):
+        na = s.isna().to_numpy()
+        return na, s.astype(object).where(~na, '').astype(str).str.strip()
+
+    # Version colonne de normalize_team (mêmes règles, dans le même ordre de priorité, via accesseurs .str)
+    def normalize_team_series(self, s):
+        """Standardise une colonne de noms d'équipes."""
+        na, team = self._as_text(s)
+        is_digit = team.str.isdigit().to_numpy()
+        
+        # Nettoyage syntaxique
+        team = team.str.replace(_TEAM_PAREN_RE, '', regex=True).str.replace('"', '', regex=False).str.strip()
+        titled = team.str.title()
+        
+        def has(sub):
+            return team.str.contains(sub, regex=False).to_numpy()
+        
+        return pd.Series(np.select(
+            [na | is_digit,
+             has("C_") & has("Ivoire"),            # Gestion spécifique encodage
+             has("Trinidad") & has("Tobago"),
+             team.isin(self.teams_mapping.keys()).to_numpy(),   # Mapping
+             titled.isin(self.teams_mapping.keys()).to_numpy(),
+             has("CTe") | has("Côte") | has("Cote")],            # Correction générique encodage
+            ["Unknown", "Cote d'Ivoire", "Trinidad and Tobago",
+             team.map(self.teams_mapping).to_numpy(dtype=object),
+             titled.map(self.teams_mapping).to_numpy(dtype=object),
+             "Cote d'Ivoire"],
+            default=titled.to_numpy(dtype=object)
+        ), index=s.index, dtype=object)
+
+    # Applique une normalisation vectorisée (colonne → colonne) une seule fois par valeur distincte puis redistribue via map
+    def _vec_normalize(self, series, fn):
+        """
+        Mémoïsation par valeur unique : le coût dépend du nombre de noms distincts
+        (quelques dizaines) et non du nombre de lignes.
+        """
+        uniq = pd.Series(series.dropna().unique(), dtype=object)
+        lut = dict(zip(uniq, fn(uniq)))
+        out = series.map(lut).astype(object)
+        na = series.isna()
+        if na.any():
+            out[na] = fn(pd.Series([None], dtype=object)).iloc[0]
+        return out
+
+    # Normalise une colonne d'équipes en une passe vectorisée (règles de normalize_team sur les valeurs distinctes)
+    def _map_teams(self, series):
+        """
+        Version vectorisée de normalize_team pour une colonne complète.
+        Lookup exact dans le mapping (puis en Title Case), comme la version scalaire :
+        chaque valeur distincte n'est normalisée qu'une fois.
+        """
+        return self._vec_normalize(series, self.normalize_team_series)
+
     # Normalise les noms de villes (supprime parenthèses, applique mapping)
     def normalize_city(self, city_name):
         """Normalise les noms de villes."""
         if pd.isna(city_name): return None
         city = str(city_name).strip().replace('"', '')
-        city = re.sub(r'\([^)]*\)', '', city).strip()
+        city = _CITY_PAREN_RE.sub('', city).strip()
         if city in self.cities_mapping:
             city = self.cities_mapping[city]
         return city.title()
     
+    # Version colonne de normalize_city
+    def normalize_city_series(self, s):
+        """Normalise une colonne de noms de villes."""
+        na, city = self._as_text(s)
+        city = city.str.replace('"', '', regex=False).str.replace(_CITY_PAREN_RE, '', regex=True).str.strip()
+        city = city.map(self.cities_mapping).fillna(city)
+        return pd.Series(np.where(na, None, city.str.title().to_numpy(dtype=object)), index=s.index, dtype=object)
+    
     # Harmonise les phases de tournoi selon nomenclature standard
     def normalize_round(self, round_str):
         """Harmonise les phases de tournoi."""
@@ -113,6 +197,20 @@ class WorldCupTransformer:
             return "Group Stage"
         return round_clean.title()
     
+    # Version colonne de normalize_round
+    def normalize_round_series(self, s):
+        """Harmonise une colonne de phases de tournoi."""
+        na, round_clean = self._as_text(s)
+        round_clean = round_clean.str.replace('"', '', regex=False)
+        lower = round_clean.str.lower()
+        return pd.Series(np.select(
+            [na,
+             round_clean.isin(self.rounds_mapping.keys()).to_numpy(),
+             (lower.str.contains('group', regex=False) | lower.str.contains('poule', regex=False)).to_numpy()],
+            [None, round_clean.map(self.rounds_mapping).to_numpy(dtype=object), "Group Stage"],
+            default=round_clean.str.title().to_numpy(dtype=object)
+        ), index=s.index, dtype=object)
+    
     # Détermine le résultat d'un match (winner ou draw) à partir des scores
     @staticmethod
     def compute_result(home_goals, away_goals, home_team=None, away_team=None):
@@ -137,22 +235,48 @@ class WorldCupTransformer:
         else:
             return "draw"
     
-    # Parse les dates de formats hétérogènes en datetime unifié
+    # Version vectorisée de compute_result (np.select sur colonnes complètes)
     @staticmethod
-    def parse_datetime(datetime_str):
-        """Parse les dates hétérogènes."""
-        if pd.isna(datetime_str): return None
-        datetime_str = str(datetime_str).strip().replace('"', '')
-        try:
-            if ' - ' in datetime_str:
-                date_part = datetime_str.split(' - ')[0].strip()
-                return pd.to_datetime(date_part, format='%d %b %Y')
-            if len(datetime_str.split()) == 3:
-                return pd.to_datetime(datetime_str, format='%d %b %Y')
-            return pd.to_datetime(datetime_str)
-        except Exception:
-            return None
-    
+    def compute_result_vec(home_goals, away_goals, home_team, away_team):
+        """
+        Détermine le résultat pour toutes les lignes en une passe (Gagnant, 'draw' ou None).
+        Même logique que compute_result : un score manquant donne None.
+        """
+        hg = pd.to_numeric(pd.Series(home_goals), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        ag = pd.to_numeric(pd.Series(away_goals), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        missing = np.isnan(hg) | np.isnan(ag)
+        # Nom d'équipe vide ou absent : libellé générique, comme compute_result
+        home = np.asarray(home_team, dtype=object)
+        away = np.asarray(away_team, dtype=object)
+        home = np.where(pd.isna(home) | (home == ''), 'home_team', home)
+        away = np.where(pd.isna(away) | (away == ''), 'away_team', away)
+        return np.select([missing, hg > ag, ag > hg], [None, home, away], default='draw')
+
+    # Convertit les colonnes équipes/villes/phases d'une source en catégories (codes entiers + table des valeurs)
+    @classmethod
+    def _to_categories(cls, df):
+        return df.astype({c: 'category' for c in cls.CATEGORY_COLUMNS if c in df.columns})
+
+    # Parse les dates de formats hétérogènes d'une colonne complète en datetime unifié (parsing groupé)
+    @staticmethod
+    def parse_datetime_series(series):
+        """
+        "12 Jun 2014 - 17:00" (heure ignorée) et "12 Jun 2014" : format explicite '%d %b %Y' en une passe,
+        autres valeurs : inférence élément par élément ; valeur illisible → NaT.
+        """
+        # Colonne déjà convertie (ex: relue d'un format typé) : rien à parser
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.astype('datetime64[ns]')
+        s = series.astype(_TEXT_DTYPE).str.strip().str.replace('"', '', regex=False)
+        has_dash = s.str.contains(' - ', regex=False, na=False)
+        s = s.where(~has_dash, s.str.split(' - ', n=1).str[0].str.strip())
+        fmt_mask = has_dash | (s.str.split().str.len() == 3).fillna(False)
+        dates = pd.Series(pd.NaT, index=s.index, dtype='datetime64[ns]')
+        dates.loc[fmt_mask] = pd.to_datetime(s[fmt_mask], format='%d %b %Y', errors='coerce')
+        rest = ~fmt_mask & s.notna()
+        dates.loc[rest] = pd.to_datetime(s[rest], format='mixed', errors='coerce')
+        return dates
+
     # Transforme les données Source 1 (1930-2010) : parsing scores, normalisation équipes/villes/rounds
     def transform_source1(self, df):
         """
@@ -163,58 +287,69 @@ class WorldCupTransformer:
         if 'year' in df.columns:
             df = df[df['year'] != 2014]  # Élimine les doublons 2014
 
-        df_clean = df.copy()
+        # Colonnes de sortie construites à part : la source n'est ni copiée ni modifiée
+        out = {}
         
         # 1. Détection Automatique des Colonnes
-        team1_cols = [c for c in df_clean.columns if 'team1' in c.lower() or 'home' in c.lower()]
-        team2_cols = [c for c in df_clean.columns if 'team2' in c.lower() or 'away' in c.lower()]
-        col_t1 = team1_cols[0] if team1_cols else df_clean.columns[3]
-        col_t2 = team2_cols[0] if team2_cols else df_clean.columns[4]
+        team1_cols = [c for c in df.columns if 'team1' in c.lower() or 'home' in c.lower()]
+        team2_cols = [c for c in df.columns if 'team2' in c.lower() or 'away' in c.lower()]
+        col_t1 = team1_cols[0] if team1_cols else df.columns[3]
+        col_t2 = team2_cols[0] if team2_cols else df.columns[4]
         
         # 2. Normalisation des équipes : "West Germany" → "Germany", "Côte d'Ivoire" → "Cote d'Ivoire"
-        df_clean['home_team'] = df_clean[col_t1].apply(self.normalize_team)
-        df_clean['away_team'] = df_clean[col_t2].apply(self.normalize_team)
+        out['home_team'] = self._vec_normalize(df[col_t1], self.normalize_team_series)
+        out['away_team'] = self._vec_normalize(df[col_t2], self.normalize_team_series)
 
 
-        # 3. Parsing des scores 
-        scores = df_clean['score'].apply(self.parse_score)
-        
-        df_clean['home_result'] = scores.apply(lambda x: x[0] if x[0] is not None else pd.NA)
-        df_clean['away_result'] = scores.apply(lambda x: x[1] if x[1] is not None else pd.NA)
-        
-        # Conversion en numérique 
-        df_clean['home_result'] = pd.to_numeric(df_clean['home_result'], errors='coerce')
-        df_clean['away_result'] = pd.to_numeric(df_clean['away_result'], errors='coerce')
+        # 3. Parsing des scores : même regex que parse_score, appliquée à toute la colonne en une passe
+        raw_scores = df['score']
+        is_seq = raw_scores.map(type).isin([tuple, list])
+        texts = raw_scores.astype(str).str.strip().where(raw_scores.notna() & ~is_seq)
+        ext = texts.str.extract(_SCORE_RE, expand=True)
+        
+        # Scores illisibles (texte non vide sans motif "x-y") signalés en un seul avertissement
+        unparsed = texts.notna() & (texts != '') & ext[0].isna()
+        if unparsed.any():
+            logger.warning("Impossible de parser %d score(s) : %s", unparsed.sum(), list(texts[unparsed].unique()))
+        
+        # Tuples/listes éventuels : repli sur le parsing scalaire
+        if is_seq.any():
+            seq_scores = raw_scores[is_seq].map(self.parse_score)
+            ext.loc[is_seq, 0] = seq_scores.str[0]
+            ext.loc[is_seq, 1] = seq_scores.str[1]
+        
+        # Conversion en entiers nullables (score manquant = <NA>, sans passage par float)
+        out['home_result'] = pd.to_numeric(ext[0], errors='coerce').astype('Int64')
+        out['away_result'] = pd.to_numeric(ext[1], errors='coerce').astype('Int64')
+        missing_scores = out['home_result'].isna() | out['away_result'].isna()
+        if missing_scores.any():
+            logger.info(f" {missing_scores.sum()} scores manquants ou illisibles (Source 1)")
 
         # 4. CALCUL RÉSULTAT 
-        df_clean['result'] = df_clean.apply(
-            lambda row: self.compute_result(
-                row['home_result'], 
-                row['away_result'], 
-                row['home_team'], 
-                row['away_team']
-            ), axis=1
-        )
+        out['result'] = self.compute_result_vec(
+            out['home_result'], out['away_result'], out['home_team'], out['away_team'])
 
         # 5. Autres colonnes
-        venue_cols = [c for c in df_clean.columns if 'venue' in c.lower() or 'city' in c.lower()]
-        col_venue = venue_cols[0] if venue_cols else df_clean.columns[6]
-        df_clean['city'] = df_clean[col_venue].apply(self.normalize_city)
+        venue_cols = [c for c in df.columns if 'venue' in c.lower() or 'city' in c.lower()]
+        col_venue = venue_cols[0] if venue_cols else df.columns[6]
+        out['city'] = self._vec_normalize(df[col_venue], self.normalize_city_series)
         
-        year_cols = [c for c in df_clean.columns if 'year' in c.lower()]
+        year_cols = [c for c in df.columns if 'year' in c.lower()]
         if year_cols:
-            df_clean['edition'] = pd.to_numeric(df_clean[year_cols[0]], errors='coerce').fillna(0).astype(int).astype(str)
-            df_clean['date'] = df_clean['edition'].apply(lambda y: pd.to_datetime(f"{y}-07-01") if y != "0" else None)
+            years = pd.to_numeric(df[year_cols[0]], errors='coerce').fillna(0).astype(int)
+            out['edition'] = years.astype(str)
+            # Date provisoire au 1er juillet de l'édition, construite en une passe depuis l'année (année 0 → NaT)
+            out['date'] = pd.to_datetime(pd.DataFrame({'year': years.where(years != 0), 'month': 7, 'day': 1}), errors='coerce')
         else:
-            df_clean['edition'] = 'Unknown'
-            df_clean['date'] = None
+            out['edition'] = 'Unknown'
+            out['date'] = pd.NaT
             
-        round_cols = [c for c in df_clean.columns if 'round' in c.lower()]
-        col_round = round_cols[0] if round_cols else df_clean.columns[1]
-        df_clean['round'] = df_clean[col_round].apply(self.normalize_round)
+        round_cols = [c for c in df.columns if 'round' in c.lower()]
+        col_round = round_cols[0] if round_cols else df.columns[1]
+        out['round'] = self._vec_normalize(df[col_round], self.normalize_round_series)
 
      
-        return df_clean[['home_team', 'away_team', 'home_result', 'away_result', 'result', 'date', 'round', 'city', 'edition']].copy()
+        return self._to_categories(pd.DataFrame(out, index=df.index, columns=['home_team', 'away_team', 'home_result', 'away_result', 'result', 'date', 'round', 'city', 'edition']))
 
     # Enrichit les matchs avec dates exactes par appariement intelligent multi-matchs
     def enrich_with_historical_dates(self, df_matches, df_dates):
@@ -229,46 +364,40 @@ class WorldCupTransformer:
         
         # 1. PRÉPARATION DES DONNÉES
         df_main = df_matches.copy()
-        df_dates_clean = df_dates.copy()
-        
-        # Parsing dates
-        def parse_date(date_str):
-            try:
-                return pd.to_datetime(str(date_str).strip(), format='%d/%m/%Y')
-            except:
-                try:
-                    return pd.to_datetime(str(date_str).strip())
-                except:
-                    return pd.NaT
         
-        df_dates_clean['date_exacte'] = df_dates_clean['date_exacte'].apply(parse_date)
-        df_dates_clean = df_dates_clean.dropna(subset=['date_exacte'])
+        # Parsing dates en deux passes groupées : format 'JJ/MM/AAAA' d'abord, inférence pour le reste
+        # (référence déjà en datetime64 : aucun re-parsing)
+        dates = df_dates['date_exacte']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            raw = dates.astype(str).str.strip()
+            dates = pd.to_datetime(raw, format='%d/%m/%Y', errors='coerce')
+            retry = dates.isna()
+            if retry.any():
+                dates[retry] = pd.to_datetime(raw[retry], format='mixed', errors='coerce')
+        # Référence jamais modifiée sur place : assign + dropna produisent directement la table de travail
+        df_dates_clean = df_dates.assign(date_exacte=dates).dropna(subset=['date_exacte'])
         
         # Normalisation équipes
-        df_dates_clean['home_norm'] = df_dates_clean['home_team'].apply(self.normalize_team)
-        df_dates_clean['away_norm'] = df_dates_clean['away_team'].apply(self.normalize_team)
+        df_dates_clean['home_norm'] = self._vec_normalize(df_dates_clean['home_team'], self.normalize_team_series)
+        df_dates_clean['away_norm'] = self._vec_normalize(df_dates_clean['away_team'], self.normalize_team_series)
         
         # 2. DÉTECTION DES CAS PROBLÉMATIQUES
         # Compter combien de fois chaque paire apparaît DANS LES MATCHS
-        match_counts = {}
-        problematic_pairs = []
-        
-        for idx, row in df_main.iterrows():
-            if int(row['edition']) > 2010:
-                continue
-                
-            home = str(row['home_team']).strip()
-            away = str(row['away_team']).strip()
-            year = row['edition']
-            
-            # Clé normalisée (triée pour ignorer l'ordre)
-            key = tuple(sorted([home, away]) + [year])
-            match_counts[key] = match_counts.get(key, 0) + 1
-        
-        # Identifier les paires problématiques (>1 match)
-        for (team1, team2, year), count in match_counts.items():
-            if count > 1:
-                problematic_pairs.append((team1, team2, year, count))
+        # Index (équipe1, équipe2 triées, édition) → positions des lignes, calculé une seule fois
+        # (sert au comptage, puis à une recherche par paire au lieu d'un scan complet du DataFrame)
+        pair_groups = self._pair_groups(df_main)
+        
+        # Édition convertie une seule fois en numérique (non numérique → ignorée) et masque des éditions ≤ 2010
+        edition_i = pd.to_numeric(df_main['edition'], errors='coerce')
+        pre2010 = (edition_i <= 2010).to_numpy()
+        pre2010_editions = set(df_main['edition'][pre2010])
+        
+        # Identifier les paires problématiques (>1 match), éditions jusqu'à 2010
+        problematic_pairs = [
+            (team1, team2, year, len(positions))
+            for (team1, team2, year), positions in pair_groups.items()
+            if len(positions) > 1 and year in pre2010_editions
+        ]
         """
         if problematic_pairs:
             logger.info(f"{len(problematic_pairs)} paires avec matchs multiples:")
@@ -276,29 +405,26 @@ class WorldCupTransformer:
                 logger.info(f"   {team1} vs {team2} ({year}): {count} matchs")
         """
         # 3. CRÉATION DU POOL DE DATES AVEC MÉTADONNÉES
-        date_pool = {}
-        
-        for idx, row in df_dates_clean.iterrows():
-            home = row['home_norm']
-            away = row['away_norm']
-            year = row['date_exacte'].year
-            date_val = row['date_exacte']
-            
-            # Clé normalisée (triée)
-            norm_key = tuple(sorted([home, away]) + [year])
-            
-            date_pool.setdefault(norm_key, []).append({
-                'date': date_val,
-                'home_original': row['home_team'],
-                'away_original': row['away_team'],
-                'home_norm': home,
-                'away_norm': away,
-                'source_idx': idx
-            })
-        
-        # Trier les dates dans chaque groupe
-        for key in date_pool:
-            date_pool[key].sort(key=lambda x: x['date'])
+        # Clé normalisée (triée) + année, dates triées (tri stable) dans chaque groupe
+        home_norm, away_norm = df_dates_clean['home_norm'], df_dates_clean['away_norm']
+        swap = home_norm > away_norm
+        pool_df = pd.DataFrame({
+            't1': home_norm.where(~swap, away_norm),
+            't2': away_norm.where(~swap, home_norm),
+            # date_exacte est déjà en datetime64 (parsée ci-dessus) : année lue directement
+            'year': df_dates_clean['date_exacte'].dt.year.astype(object),
+            'date': df_dates_clean['date_exacte'],
+            'home_original': df_dates_clean['home_team'],
+            'away_original': df_dates_clean['away_team'],
+            'home_norm': home_norm,
+            'away_norm': away_norm,
+            'source_idx': df_dates_clean.index,
+        }).sort_values('date', kind='mergesort')
+        pool_cols = ['date', 'home_original', 'away_original', 'home_norm', 'away_norm', 'source_idx']
+        date_pool = {
+            key: group[pool_cols].to_dict('records')
+            for key, group in pool_df.groupby(['t1', 't2', 'year'], sort=False)
+        }
         
         # 4. ALGORITHME D'APPARIEMENT INTELLIGENT
         # Pour chaque paire problématique, faire un appariement optimal
@@ -310,17 +436,13 @@ class WorldCupTransformer:
             key = (team1, team2, year)
             
             # Récupérer les matchs de cette paire
-            matches = df_main[
-                ((df_main['home_team'] == team1) & (df_main['away_team'] == team2) |
-                (df_main['home_team'] == team2) & (df_main['away_team'] == team1)) &
-                (df_main['edition'] == year)
-            ].copy()
+            matches = df_main.iloc[pair_groups.get(key, [])].copy()
             
             if len(matches) != match_count:
                 continue
             
             # Récupérer les dates disponibles
-            norm_key = tuple(sorted([team1, team2]) + [year])
+            norm_key = (min(team1, team2), max(team1, team2), year)
             available_dates_info = date_pool.get(norm_key, [])
             
             """if len(available_dates_info) == 0:
@@ -344,91 +466,97 @@ class WorldCupTransformer:
                 'Final': 6
             }
             
-            matches['round_order'] = matches['round'].map(round_order_map).fillna(99)
+            # Lookup sur les valeurs brutes : sur une colonne category, map renverrait une catégorielle sans 99
+            matches['round_order'] = matches['round'].astype(object).map(round_order_map).fillna(99)
             matches = matches.sort_values(['round_order', 'date'])
             
             # 4.2. ORDONNER LES DATES disponibles (déjà triées)
             dates_to_assign = [info['date'] for info in available_dates_info]
             
             # 4.3. APPARIEMENT : première date au premier match, etc.
-            for match_idx, (match_idx_row, match) in enumerate(matches.iterrows()):
-                if match_idx < len(dates_to_assign):
-                    assigned_date = dates_to_assign[match_idx]
-                    date_assignments[match_idx_row] = assigned_date
-                    
-                    logger.info(f" Appariement {team1} vs {team2} ({year}):")
-                    logger.info(f"   Match {match_idx+1}: {match['round']} -> {assigned_date.date()}")
+            # zip sur les index et les phases (pas de Series par ligne) ; s'arrête avec la dernière date disponible
+            pairs = list(zip(matches.index, matches['round'].to_numpy(), dates_to_assign))
+            date_assignments.update((label, assigned_date) for label, _, assigned_date in pairs)
+            
+            # Détail par match en DEBUG uniquement (un résumé est loggé après la boucle)
+            if logger.isEnabledFor(logging.DEBUG):
+                for match_idx, (_, round_name, assigned_date) in enumerate(pairs):
+                    logger.debug(" Appariement %s vs %s (%s):", team1, team2, year)
+                    logger.debug("   Match %d: %s -> %s", match_idx + 1, round_name, assigned_date.date())
                 """
                 else:
                     # Plus de dates disponibles, garder la date originale
                     logger.warning(f"Plus de dates pour {team1} vs {team2}, match {match_idx+1} garde date originale")
                 """
-        # 5. APPLIQUER LES ASSIGNATIONS
-        updated_count = 0
-        
-        for match_idx, assigned_date in date_assignments.items():
-            original_date = df_main.at[match_idx, 'date']
-            if original_date != assigned_date:
-                df_main.at[match_idx, 'date'] = assigned_date
-                updated_count += 1
-        
-        # 6. POUR LES MATCHS NON PROBLÉMATIQUES : logique simple
-        simple_updated = 0
-        used_dates_simple = {}
-        
-        for idx, row in df_main.iterrows():
-            if idx in date_assignments:  # Déjà traité
-                continue
-                
-            year = row['edition']
-            try:
-                if int(year) > 2010:
-                    continue
-            except:
-                continue
-            
-            home = str(row['home_team']).strip()
-            away = str(row['away_team']).strip()
-            
-            # Chercher dates disponibles
-            norm_key = tuple(sorted([home, away]) + [int(year)])
-            available = date_pool.get(norm_key, [])
-            
-            if available:
-                # Prendre la première date (ou la plus proche si plusieurs matchs)
-                track_key = f"{home}_{away}_{year}"
-                if track_key not in used_dates_simple:
-                    used_dates_simple[track_key] = []
-                
-                for date_info in available:
-                    date_val = date_info['date']
-                    if date_val not in used_dates_simple[track_key]:
-                        if df_main.at[idx, 'date'] != date_val:
-                            df_main.at[idx, 'date'] = date_val
-                            simple_updated += 1
-                        used_dates_simple[track_key].append(date_val)
-                        break
+        logger.info(f" {len(date_assignments)} dates appariées sur {len(problematic_pairs)} paires à matchs multiples")
+        
+        # 5. APPLIQUER LES ASSIGNATIONS (une seule écriture groupée)
+        updated_count = self._assign_dates(df_main, list(date_assignments), list(date_assignments.values()))
+        
+        # 6. POUR LES MATCHS NON PROBLÉMATIQUES : logique simple (jointure vectorisée)
+        # Le k-ième match d'une même affiche (ordre domicile/extérieur conservé) et d'une même édition
+        # reçoit la k-ième date distincte de la paire : même choix que le parcours séquentiel
+        # « première date non encore utilisée pour cette affiche »
+        # Seuls les matchs jusqu'à 2010 (édition numérique) non encore appariés sont concernés
+        todo = pre2010 & ~df_main.index.isin(list(date_assignments))
+        home = df_main.loc[todo, 'home_team'].astype(str).str.strip()
+        away = df_main.loc[todo, 'away_team'].astype(str).str.strip()
+        swap = home > away
+        pending = pd.DataFrame({
+            't1': home.where(~swap, away),
+            't2': away.where(~swap, home),
+            'year': edition_i[todo].astype('int64'),
+            'rank': df_main.loc[todo].groupby([home, away, df_main.loc[todo, 'edition']], sort=False).cumcount(),
+        }).rename_axis('label').reset_index()
+        
+        # Dates distinctes de chaque paire, dans l'ordre chronologique du pool, numérotées 0, 1, 2...
+        pool_dates = pool_df[['t1', 't2', 'year', 'date']].drop_duplicates().astype({'year': 'int64'})
+        pool_dates['rank'] = pool_dates.groupby(['t1', 't2', 'year'], sort=False).cumcount()
+        
+        hits = pending.merge(pool_dates, on=['t1', 't2', 'year', 'rank'], how='inner')
+        simple_updated = self._assign_dates(df_main, list(hits['label']), hits['date'])
         
         logger.info(f" {updated_count + simple_updated} dates mises à jour")
         
-        # 7. VÉRIFICATION FINALE
-        self._verify_date_assignments(df_main, problematic_pairs, date_pool)
+        # 7. VÉRIFICATION FINALE (seules les dates ont changé : l'index des paires reste valable)
+        self._verify_date_assignments(df_main, problematic_pairs, date_pool, pair_groups)
         
         return df_main
 
+    # Écrit un lot de dates (par étiquette d'index) en une seule affectation .loc, retourne le nombre de valeurs modifiées
+    @staticmethod
+    def _assign_dates(df, labels, dates):
+        if not labels:
+            return 0
+        new_dates = pd.to_datetime(dates).to_numpy()
+        changed = df.loc[labels, 'date'].to_numpy() != new_dates
+        df.loc[labels, 'date'] = new_dates
+        return int(changed.sum())
+
+    # Regroupe les lignes par paire d'équipes (ordre ignoré) et édition : {(t1, t2, édition): positions}
+    @staticmethod
+    def _pair_groups(df):
+        home = df['home_team'].astype(str).str.strip()
+        away = df['away_team'].astype(str).str.strip()
+        swap = home > away
+        keys = pd.DataFrame({
+            't1': home.where(~swap, away),
+            't2': away.where(~swap, home),
+            'edition': df['edition'],
+        })
+        return keys.groupby(['t1', 't2', 'edition'], sort=False).indices
+
     # Vérifie la cohérence des assignations de dates pour paires problématiques
-    def _verify_date_assignments(self, df, problematic_pairs, date_pool):
+    def _verify_date_assignments(self, df, problematic_pairs, date_pool, pair_groups=None):
         """Vérification finale des assignations."""
         logger.info(" VÉRIFICATION FINALE des dates...")
         
         issues = []
+        if pair_groups is None:
+            pair_groups = self._pair_groups(df)
         
         for team1, team2, year, expected_count in problematic_pairs:
-            matches = df[
-                ((df['home_team'] == team1) & (df['away_team'] == team2) |
-                (df['home_team'] == team2) & (df['away_team'] == team1)) &
-                (df['edition'] == year)
-            ]
+            matches = df.iloc[pair_groups.get((team1, team2, year), [])]
             
             if len(matches) != expected_count:
                 issues.append(f"{team1} vs {team2} ({year}): {len(matches)} matchs au lieu de {expected_count}")
@@ -445,10 +573,11 @@ class WorldCupTransformer:
                     logger.warning(f"   {row['round']}: {row['date'].date() if pd.notna(row['date']) else 'N/A'}")
                 """   
                 # Afficher les dates disponibles
-                norm_key = tuple(sorted([team1, team2]) + [year])
+                norm_key = (min(team1, team2), max(team1, team2), year)
                 available = date_pool.get(norm_key, [])
                 if available:
-                    logger.warning(f"   Dates disponibles: {[info['date'].date() for info in available]}")
+                    if logger.isEnabledFor(logging.WARNING):
+                        logger.warning("   Dates disponibles: %s", [info['date'].date() for info in available])
         """
         if not issues:
             logger.info(" Toutes les dates sont correctement assignées !")
@@ -461,132 +590,170 @@ class WorldCupTransformer:
     # Transforme les données Source 2 (2014) : extraction colonnes spécifiques, parsing dates    
     def transform_source2(self, df):
         logger.info("Transformation Source 2 (2014)...")
-        df_clean = df.copy()
-        df_clean['home_result'] = pd.to_numeric(df_clean.get('Home Team Goals'), errors='coerce').fillna(0).astype(int)
-        df_clean['away_result'] = pd.to_numeric(df_clean.get('Away Team Goals'), errors='coerce').fillna(0).astype(int)
-        
-        if 'Home Team Name' in df_clean.columns:
-            df_clean['home_team'] = df_clean['Home Team Name'].apply(self.normalize_team)
-            df_clean['away_team'] = df_clean['Away Team Name'].apply(self.normalize_team)
+        # Colonnes de sortie construites à part : la source n'est ni copiée ni modifiée
+        out = {}
+        out['home_result'] = pd.to_numeric(df.get('Home Team Goals'), errors='coerce').fillna(0).astype(int)
+        out['away_result'] = pd.to_numeric(df.get('Away Team Goals'), errors='coerce').fillna(0).astype(int)
+        
+        if 'Home Team Name' in df.columns:
+            out['home_team'] = self._vec_normalize(df['Home Team Name'], self.normalize_team_series)
+            out['away_team'] = self._vec_normalize(df['Away Team Name'], self.normalize_team_series)
+        else:
+            out['home_team'], out['away_team'] = df['home_team'], df['away_team']
         
-        df_clean['result'] = df_clean.apply(lambda row: self.compute_result(row['home_result'], row['away_result'], row['home_team'], row['away_team']), axis=1)
-        df_clean['city'] = df_clean.get('City', 'Unknown').apply(self.normalize_city) if 'City' in df_clean.columns else 'Unknown'
-        df_clean['round'] = df_clean.get('Stage', 'Group Stage').apply(self.normalize_round) if 'Stage' in df_clean.columns else 'Group Stage'
-        df_clean['edition'] = df_clean.get('Year', '2014').astype(str) if 'Year' in df_clean.columns else '2014'
+        out['result'] = self.compute_result_vec(out['home_result'], out['away_result'], out['home_team'], out['away_team'])
+        out['city'] = self._vec_normalize(df['City'], self.normalize_city_series) if 'City' in df.columns else 'Unknown'
+        out['round'] = self._vec_normalize(df['Stage'], self.normalize_round_series) if 'Stage' in df.columns else 'Group Stage'
+        out['edition'] = df.get('Year', '2014').astype(str) if 'Year' in df.columns else '2014'
         
-        if 'Datetime' in df_clean.columns:
-            df_clean['date'] = df_clean['Datetime'].apply(self.parse_datetime)
+        if 'Datetime' in df.columns:
+            out['date'] = self.parse_datetime_series(df['Datetime'])
         else:
-            df_clean['date'] = pd.to_datetime('2014-07-01')
+            out['date'] = pd.to_datetime('2014-07-01')
 
-        return df_clean[['home_team', 'away_team', 'home_result', 'away_result', 'result', 'date', 'round', 'city', 'edition']].copy()
+        return self._to_categories(pd.DataFrame(out, index=df.index, columns=['home_team', 'away_team', 'home_result', 'away_result', 'result', 'date', 'round', 'city', 'edition']))
+
+    # Retourne la première colonne dont le nom (minuscules) contient tous les tokens
+    @staticmethod
+    def _find_col(col_lc, *tokens):
+        return next((c for c, lc in col_lc if all(t in lc for t in tokens)), None)
 
     # Transforme les données Source 3 (Fifa_world_cup_matches) : mapping colonnes dynamique
     def transform_source3(self, df):
         logger.info("Transformation Source 3 (Fifa_world_cup_matches)...")
-        df_clean = df.copy()
+        # Noms de colonnes en minuscules calculés une seule fois pour toutes les recherches
+        col_lc = [(c, c.lower()) for c in df.columns]
         col_map = {'home_team': 'team1', 'away_team': 'team2'}
-        for col in df_clean.columns:
-            if 'number of goals team1' in col.lower(): col_map['home_goals'] = col
-            elif 'number of goals team2' in col.lower(): col_map['away_goals'] = col
-            elif 'date' in col.lower(): col_map['date'] = col
-            elif 'year' in col.lower(): col_map['year'] = col
-            elif 'city' in col.lower(): col_map['city'] = col
-            elif 'round' in col.lower(): col_map['round'] = col
-
-        result_df = pd.DataFrame()
-        result_df['home_team'] = df_clean[col_map['home_team']].apply(self.normalize_team)
-        result_df['away_team'] = df_clean[col_map['away_team']].apply(self.normalize_team)
-        result_df['home_result'] = pd.to_numeric(df_clean[col_map['home_goals']], errors='coerce').fillna(0).astype(int)
-        result_df['away_result'] = pd.to_numeric(df_clean[col_map['away_goals']], errors='coerce').fillna(0).astype(int)
-        result_df['result'] = result_df.apply(lambda row: self.compute_result(row['home_result'], row['away_result'], row['home_team'], row['away_team']), axis=1)
-        
-        def parse_date_special(date_str):
-            if pd.isna(date_str): return None
-            s = str(date_str).strip()
-            if len(s) == 7 and s[2:5].isalpha():
-                try: return pd.to_datetime(f"{s[:2]} {s[2:5]} 20{s[5:]}", format='%d %b %Y')
-                except: pass
-            return self.parse_datetime(s)
-
-        if 'date' in col_map: result_df['date'] = df_clean[col_map['date']].apply(parse_date_special)
-        else: result_df['date'] = None
+        for key, token in [('home_goals', 'number of goals team1'), ('away_goals', 'number of goals team2'),
+                           ('date', 'date'), ('year', 'year'), ('city', 'city'), ('round', 'round')]:
+            col = self._find_col(col_lc, token)
+            if col is not None: col_map[key] = col
+
+        # Colonnes construites à part puis assemblées par un seul constructeur (pas de réallocation colonne par colonne)
+        out = {}
+        out['home_team'] = self._map_teams(df[col_map['home_team']])
+        out['away_team'] = self._map_teams(df[col_map['away_team']])
+        out['home_result'] = pd.to_numeric(df[col_map['home_goals']], errors='coerce').fillna(0).astype(int)
+        out['away_result'] = pd.to_numeric(df[col_map['away_goals']], errors='coerce').fillna(0).astype(int)
+        out['result'] = self.compute_result_vec(out['home_result'], out['away_result'], out['home_team'], out['away_team'])
+        
+        # Dates au format compact "20NOV22" (7 caractères, mois en lettres) : "20 NOV 2022" parsé en lot,
+        # le reste (et les compacts illisibles) passe par parse_datetime_series
+        dates = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+        if 'date' in col_map:
+            s = df[col_map['date']].astype(_TEXT_DTYPE).str.strip()
+            mask = (s.str.len().eq(7) & s.str[2:5].str.isalpha()).fillna(False).to_numpy(dtype=bool)
+            compact = s[mask]
+            dates.loc[mask] = pd.to_datetime(compact.str[:2] + ' ' + compact.str[2:5] + ' 20' + compact.str[5:],
+                                             format='%d %b %Y', errors='coerce')
+            rest = (~mask | dates.isna().to_numpy()) & s.notna().to_numpy()
+            dates.loc[rest] = self.parse_datetime_series(s[rest])
+        out['date'] = dates.fillna(pd.to_datetime('1900-01-01'))
             
-        result_df['edition'] = df_clean[col_map['year']].astype(str) if 'year' in col_map else '2022'
-        result_df['city'] = df_clean[col_map['city']].apply(self.normalize_city) if 'city' in col_map else 'Unknown'
-        result_df['round'] = df_clean[col_map['round']].apply(self.normalize_round) if 'round' in col_map else 'Group Stage'
-        if result_df['date'].isnull().any(): result_df['date'] = result_df['date'].fillna(pd.to_datetime('1900-01-01'))
+        out['edition'] = df[col_map['year']].astype(str) if 'year' in col_map else '2022'
+        out['city'] = self._vec_normalize(df[col_map['city']], self.normalize_city_series) if 'city' in col_map else 'Unknown'
+        out['round'] = self._vec_normalize(df[col_map['round']], self.normalize_round_series) if 'round' in col_map else 'Group Stage'
+        result_df = pd.DataFrame(out, index=df.index, columns=['home_team', 'away_team', 'home_result', 'away_result', 'result', 'date', 'edition', 'city', 'round'])
             
-        return result_df
+        return self._to_categories(result_df)
 
     # Transforme les données Source 4 (2018 JSON) : extraction groupes + knockout, mapping stades
     def transform_source4(self, json_data):
         logger.info("Transformation Source 4 (2018)...")
         if not json_data: return pd.DataFrame()
-        matches_list = []
-
-        # Extraction des matchs
-        for g, d in json_data.get('groups', {}).items():
-            for m in d.get('matches', []):
-                m['type'] = 'group'; m['group'] = g; matches_list.append(m)
-
-        # Parcourt les phases finales (round_16, quarter-finals, etc.)
-        # Ajoute chaque match avec marquage "knockout" et nom de phase
-        for s, d in json_data.get('knockout', {}).items():
-            for m in d.get('matches', []):
-                m['type'] = 'knockout'; m['round_raw'] = s; matches_list.append(m)
-        
-        final_list = []
-        for m in matches_list:
-            # teams_mapping_2018 : {1: "Russia", 2: "Saudi Arabia", ...}
-            # Exemple        : Convertit home_team: 9 → "France"
-            home = self.teams_mapping_2018.get(m.get('home_team'), f"Unknown_{m.get('home_team')}")
-            away = self.teams_mapping_2018.get(m.get('away_team'), f"Unknown_{m.get('away_team')}")
-
-            # Normalisation des noms
-            home_n, away_n = self.normalize_team(home), self.normalize_team(away)
-
-            # Extrait "2018-06-14T18:00:00+03:00" → "2018-06-14"
-            # → Fallback : 1er juillet 2018 si manquant
-            d_obj = pd.to_datetime(m.get('date', '').split('T')[0]) if m.get('date') else pd.to_datetime('2018-07-01')
-
-            # Recherche dans json_data['stadiums'] : {id: 1, city: "Moscow", ...}
-            # Trouve la ville correspondant à l'ID du stade
-            s_id = m.get('stadium')
-            city = next((s['city'] for s in json_data.get('stadiums', []) if s['id'] == s_id), "Unknown")
-            
-            # Création du DataFrame final
-            final_list.append({
-                'home_team': home_n, 'away_team': away_n,
-                'home_result': m.get('home_result', 0), 'away_result': m.get('away_result', 0),
-                'result': self.compute_result(m.get('home_result', 0), m.get('away_result', 0), home_n, away_n),
-                'date': d_obj, 
-                # Groupes : toujours "Group Stage"
-                # Phase finale : normalise "round_16" → "Round of 16"
-                'round': self.normalize_round(m.get('round_raw', 'Group Stage')) if m['type'] == 'knockout' else 'Group Stage',
-                'city': self.normalize_city(city), 'edition': '2018', 'source': 'json_2018', 'stadium_id': s_id
-            })
-        return pd.DataFrame(final_list)
+        # Aplatissement des matchs de groupes et de phases finales par json_normalize (phase en métadonnée)
+        # Groupes : phase vide, remplacée plus bas par "Group Stage"
+        # Score absent du JSON → 0 ; un score explicitement null reste manquant (pas de résultat inventé)
+        def with_defaults(matches):
+            return [{'home_result': 0, 'away_result': 0, **m} for m in matches]
+
+        groups = [{'round_raw': None, 'matches': with_defaults(d['matches'])}
+                  for d in json_data.get('groups', {}).values() if d.get('matches')]
+        # Phases finales (round_16, quarter-finals, etc.) : le nom de phase est conservé
+        knockout = [{'round_raw': s, 'matches': with_defaults(d['matches'])}
+                    for s, d in json_data.get('knockout', {}).items() if d.get('matches')]
+        if not groups and not knockout: return pd.DataFrame()
+        flat = pd.json_normalize(groups + knockout, record_path='matches', meta='round_raw')
+        # Clés absentes de tous les matchs : colonnes vides plutôt qu'une KeyError
+        flat = flat.reindex(columns=flat.columns.union(['home_team', 'away_team', 'home_result', 'away_result', 'date', 'stadium'], sort=False))
+        cols = {
+            'home_id': flat['home_team'].to_numpy(dtype=object), 'away_id': flat['away_team'].to_numpy(dtype=object),
+            'home_result': flat['home_result'], 'away_result': flat['away_result'],
+            'date': flat['date'], 'stadium_id': flat['stadium'].to_numpy(),
+            'round_raw': flat['round_raw'].to_numpy(dtype=object),
+        }
+
+        # Lookup construit une seule fois par JSON : ID stade → ville (O(N+S) au lieu d'un scan par match)
+        # Variable locale : une transformation ne laisse aucun état sur l'instance (voir extract_and_transform)
+        stadium_city = {st.get('id'): st.get('city', 'Unknown') for st in json_data.get('stadiums', [])}
+
+        # teams_mapping_2018 : {1: "Russia", 2: "Saudi Arabia", ...} → Convertit home_team: 9 → "France"
+        # IDs absents du mapping → "Unknown_<id>", signalés en un seul avertissement
+        def map_team_ids(ids):
+            ids = pd.Series(ids, dtype=object)
+            mapped = ids.map(self.teams_mapping_2018)
+            unknown = ids[mapped.isna()].unique()
+            if len(unknown):
+                logger.warning(f" IDs équipes 2018 inconnus: {list(unknown)}")
+            return self._map_teams(mapped.fillna('Unknown_' + ids.astype(str)))
+
+        df_2018 = pd.DataFrame({
+            'home_team': map_team_ids(cols['home_id']),
+            'away_team': map_team_ids(cols['away_id']),
+            'home_result': cols['home_result'].to_numpy(),
+            'away_result': cols['away_result'].to_numpy(),
+        })
+        df_2018['result'] = self.compute_result_vec(
+            df_2018['home_result'], df_2018['away_result'], df_2018['home_team'], df_2018['away_team'])
+
+        # Parsing groupé des dates ISO → Fallback : 1er juillet 2018 si manquante ou invalide
+        dates = pd.Series(cols['date'], dtype=object).str.split('T').str[0]
+        df_2018['date'] = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce').fillna(pd.Timestamp('2018-07-01'))
+
+        # Phase finale : normalise "round_16" → "Round of 16" (une fois par phase distincte)
+        rounds = pd.Series(cols['round_raw'], dtype=object)
+        df_2018['round'] = self._vec_normalize(rounds, self.normalize_round_series).fillna('Group Stage')
+
+        # Ville du stade via le lookup ID → ville
+        stadium_ids = pd.Series(cols['stadium_id'], dtype=object)
+        cities = stadium_ids.map(stadium_city).fillna("Unknown")
+        df_2018['city'] = self._vec_normalize(cities, self.normalize_city_series)
+
+        df_2018['edition'] = '2018'
+        df_2018['source'] = 'json_2018'
+        df_2018['stadium_id'] = cols['stadium_id']
+        return self._to_categories(df_2018)
 
     # Corrige les villes manquantes de 2022 via lookup table de référence
     def enrich_2022_with_cities(self, df_2022, df_cities):
         logger.info("Correction des villes 2022...")
         if df_cities is None or df_cities.empty: return df_2022
-        df_main = df_2022.copy()
-        city_lookup = {}
-        for _, row in df_cities.iterrows():
-            t1, t2 = self.normalize_team(row['home_team']), self.normalize_team(row['away_team'])
-            city_lookup[(t1, t2)] = self.normalize_city(row['city'])
-
-        def find_city(row):
-            if row['city'] != 'Unknown' and pd.notna(row['city']): return row['city']
-            t1, t2 = self.normalize_team(row['home_team']), self.normalize_team(row['away_team'])
-            if (t1, t2) in city_lookup: return city_lookup[(t1, t2)]
-            if (t2, t1) in city_lookup and sorted([t1, t2]) != ['Croatia', 'Morocco']: return city_lookup[(t2, t1)]
-            return row['city']
-
-        df_main['city'] = df_main.apply(find_city, axis=1)
-        return df_main
+        # Normalisation une seule fois par valeur distincte (référence et matchs)
+        ref_t1 = self._vec_normalize(df_cities['home_team'], self.normalize_team_series)
+        ref_t2 = self._vec_normalize(df_cities['away_team'], self.normalize_team_series)
+        ref_city = self._vec_normalize(df_cities['city'], self.normalize_city_series)
+        # Table de référence (paire → ville), une entrée par paire (la dernière l'emporte, comme un dict)
+        ref = pd.DataFrame({'t1': ref_t1, 't2': ref_t2, 'ref_city': ref_city, 'found': True})
+        ref = ref.drop_duplicates(['t1', 't2'], keep='last')
+
+        home = self._vec_normalize(df_2022['home_team'], self.normalize_team_series).to_numpy()
+        away = self._vec_normalize(df_2022['away_team'], self.normalize_team_series).to_numpy()
+        city = df_2022['city'].to_numpy(dtype=object)
+
+        # Lookups vectorisés : paire dans le même ordre, puis paire inversée
+        direct = pd.DataFrame({'t1': home, 't2': away}).merge(ref, on=['t1', 't2'], how='left')
+        reverse = pd.DataFrame({'t1': away, 't2': home}).merge(ref, on=['t1', 't2'], how='left')
+
+        # Ville déjà connue conservée ; paire inversée exclue pour Croatia/Morocco
+        keep = pd.notna(city) & (city != 'Unknown')
+        croatia_morocco = ((home == 'Croatia') & (away == 'Morocco')) | ((home == 'Morocco') & (away == 'Croatia'))
+        cities = np.select(
+            [keep, direct['found'].notna().to_numpy(), reverse['found'].notna().to_numpy() & ~croatia_morocco],
+            [city, direct['ref_city'].to_numpy(dtype=object), reverse['ref_city'].to_numpy(dtype=object)],
+            default=city
+        )
+        # assign partage les colonnes inchangées au lieu de copier tout le DataFrame
+        return df_2022.assign(city=pd.Series(cities, index=df_2022.index, dtype='category'))
    
    # Fusionne toutes les sources, déduplique, filtre preliminary rounds, sauvegarde dates manquantes
     def consolidate(self, dfs_list):
@@ -602,26 +769,44 @@ class WorldCupTransformer:
             return None
         
         # Filtrer les DataFrames None ou vides
-        valid_dfs = []
-        for i, df in enumerate(dfs_list):
-            if df is None:
-                logger.warning(f"DataFrame {i} est None, ignoré")
-            elif df.empty:
-                logger.warning(f"DataFrame {i} est vide, ignoré")
-            else:
-                valid_dfs.append(df)
-                logger.info(f" DataFrame {i}: {len(df)} lignes")
+        valid_dfs = [df for df in dfs_list if df is not None and not df.empty]
+        ignored = [i for i, df in enumerate(dfs_list) if df is None or df.empty]
+        if ignored:
+            logger.warning(f"DataFrames None ou vides ignorés : {ignored}")
         
         if len(valid_dfs) == 0:
             logger.error("Aucun DataFrame valide à consolider!")
             return None
         
-        logger.info(f" {len(valid_dfs)} DataFrames valides à fusionner")
+        logger.info(f" {len(valid_dfs)} DataFrames valides à fusionner ({sum(map(len, valid_dfs))} lignes)")
         
-        # 1. Fusion
+        # 1. Fusion (sources pré-triées par date : le tri final stable n'a plus qu'à fusionner des séquences triées)
         try:
-            df_all = pd.concat(valid_dfs, ignore_index=True)
+            valid_dfs = [df.sort_values('date', kind='mergesort') for df in valid_dfs]
+            # Catégories des sources unifiées avant la fusion : concat conserve alors le type category
+            # (des catégories différentes d'une source à l'autre retomberaient en object)
+            # result et edition aussi : la fusion ne recopie alors que des codes entiers, aucune chaîne
+            unified = {
+                c: pd.CategoricalDtype(union_categoricals(
+                    # Colonnes encore en object : catégories object même si une source n'a que des NaN
+                    [pd.Categorical(df[c] if isinstance(df[c].dtype, pd.CategoricalDtype) else df[c].astype(object))
+                     for df in valid_dfs], sort_categories=True).categories)
+                for c in self.CATEGORY_COLUMNS + ('result', 'edition')
+                if all(c in df.columns for df in valid_dfs)
+            }
+            valid_dfs = [df.astype(unified) for df in valid_dfs]
+            df_all = pd.concat(valid_dfs, ignore_index=True, copy=False)
             logger.info(f" Fusion réussie: {len(df_all)} lignes initiales")
+            # Colonnes texte restantes en catégories, scores en entiers 8 bits nullables (un score de match tient dans un octet)
+            df_all = df_all.astype({c: 'category' for c in ['home_team', 'away_team', 'result', 'round', 'city', 'edition']})
+            for c in ['home_result', 'away_result']:
+                df_all[c] = pd.to_numeric(df_all[c], errors='coerce').astype('Int8')
+            # Équipes et résultat sur un même jeu de catégories (équipes ∪ 'draw') :
+            # les comparaisons résultat/équipe se font alors sur les codes entiers
+            shared = pd.CategoricalDtype(df_all['home_team'].cat.categories
+                                         .union(df_all['away_team'].cat.categories)
+                                         .union(df_all['result'].cat.categories))
+            df_all = df_all.astype({'home_team': shared, 'away_team': shared, 'result': shared})
         except Exception as e:
             logger.error(f"Erreur lors de la fusion: {e}")
             import traceback
@@ -633,7 +818,9 @@ class WorldCupTransformer:
         if missing_dates.sum() > 0:
             logger.warning(f"{missing_dates.sum()} matchs n'ont pas de date ! Tentative de sauvetage...")
             try:
-                fallback_dates = pd.to_datetime(df_all.loc[missing_dates, 'edition'] + '-01-01', errors='coerce')
+                # Date construite directement depuis l'année (pas de concaténation ni de parsing de chaînes)
+                years = pd.to_numeric(df_all.loc[missing_dates, 'edition'].astype(object), errors='coerce')
+                fallback_dates = pd.to_datetime(pd.DataFrame({'year': years, 'month': 1, 'day': 1}), errors='coerce')
                 df_all.loc[missing_dates, 'date'] = fallback_dates
                 logger.info(" Matchs sauvés avec une date par défaut (01/01/AAAA).")
             except Exception as e:
@@ -647,7 +834,10 @@ class WorldCupTransformer:
         
         # 4. FILTRAGE : "BLACKLIST" (Prelim)
         try:
-            mask_exclude = df_all['round'].astype(str).str.contains('preliminary', case=False, na=False)
+            # Recherche faite une fois par phase distincte (catégories), puis filtrage sur les codes entiers
+            rounds = df_all['round'].cat
+            bad_codes = np.flatnonzero(rounds.categories.astype(str).str.contains('preliminary', case=False, na=False))
+            mask_exclude = rounds.codes.isin(bad_codes)
             a_exclure = df_all[mask_exclude]
             if len(a_exclure) > 0:
                 logger.info(f"{len(a_exclure)} matchs à exclure (contenant 'preliminary')")
@@ -655,22 +845,33 @@ class WorldCupTransformer:
         except Exception as e:
             logger.error(f"Erreur lors du filtrage 'preliminary': {e}")
         
-        # 5. Dédoublonnage et Tri
+        # 5. Tri puis dédoublonnage
+        try:
+            # Toutes les sources livrent déjà du datetime64 : conversion uniquement si nécessaire
+            if not pd.api.types.is_datetime64_any_dtype(df_all['date']):
+                df_all['date'] = pd.to_datetime(df_all['date'], errors='coerce', format='mixed')
+            # Tri stable d'abord : les doublons partagent la même date, le premier rencontré reste donc
+            # celui de l'ordre de fusion, et il n'y a plus de second tri après le dédoublonnage
+            df_all = df_all.sort_values('date', kind='mergesort', ignore_index=True)
+        except Exception as e:
+            logger.error(f"Erreur lors du tri: {e}")
+        
         try:
             before_dedup = len(df_all)
-            df_all = df_all.drop_duplicates(subset=['home_team', 'away_team', 'date', 'round'], keep='first')
+            # Clé composite entière : chaque colonne est factorisée une fois (NaN = valeur à part entière,
+            # comme drop_duplicates), puis combinée en base mixte → masque duplicated par hachage int64
+            key = np.zeros(len(df_all), dtype=np.int64)
+            for c in ['home_team', 'away_team', 'date', 'round']:
+                codes, uniques = pd.factorize(df_all[c], use_na_sentinel=False)
+                key = key * (len(uniques) + 1) + codes
+            df_all = df_all.loc[~pd.Series(key).duplicated().to_numpy()].reset_index(drop=True)
             if len(df_all) < before_dedup:
                 logger.info(f" {before_dedup - len(df_all)} doublons supprimés")
         except Exception as e:
             logger.error(f"Erreur lors du dédoublonnage: {e}")
         
-        # Conversion date et tri
-        try:
-            df_all['date'] = pd.to_datetime(df_all['date'])
-            df_all = df_all.sort_values('date').reset_index(drop=True)
-            df_all['id_match'] = range(1, len(df_all) + 1)
-        except Exception as e:
-            logger.error(f"Erreur lors du tri/numérotation: {e}")
+        # Numérotation dans l'ordre chronologique
+        df_all['id_match'] = np.arange(1, len(df_all) + 1, dtype=np.int32)
         
         # Colonnes finales
         cols = ['id_match', 'home_team', 'away_team', 'home_result', 'away_result', 
@@ -685,7 +886,7 @@ class WorldCupTransformer:
             return None
         
         try:
-            final_df = df_all[cols].copy()
+            final_df = df_all.reindex(columns=cols, copy=False)
             logger.info(f" Consolidation terminée : {len(final_df)} matchs.")
             logger.info(f"   Colonnes finales: {final_df.columns.tolist()}")
             return final_df
@@ -695,6 +896,20 @@ class WorldCupTransformer:
             logger.error(traceback.format_exc())
             return None
 
+    # Masques résultat présent / nul / victoire domicile / victoire extérieur
+    @staticmethod
+    def _result_masks(df):
+        """Comparaisons sur les codes si équipes et résultat partagent leurs catégories, sinon sur les valeurs."""
+        r, ht, at = df['result'], df['home_team'], df['away_team']
+        if isinstance(r.dtype, pd.CategoricalDtype) and r.dtype == ht.dtype == at.dtype:
+            r, ht, at = (x.cat.codes.to_numpy() for x in (r, ht, at))
+            # Code -1 = valeur manquante : jamais égale à une équipe ni au nul
+            has_result = r >= 0
+            draw_code = df['result'].cat.categories.get_indexer(['draw'])[0]
+            return has_result, has_result & (r == draw_code), has_result & (r == ht), has_result & (r == at)
+        r, ht, at = (x.to_numpy(dtype=object) for x in (r, ht, at))
+        return pd.notna(r), r == 'draw', r == ht, r == at
+
     # Valide la qualité des données : complétude et logique des scores   
     def validate(self, df):
         """Vérifie la qualité des données (complétude des colonnes et logique des scores)."""
@@ -712,20 +927,34 @@ class WorldCupTransformer:
         if missing: 
             issues.append(f"Colonnes manquantes: {missing}")
         
-        # 2. Vérification logique (Le gagnant correspond-il au score ?)
-        for idx, row in df.iterrows():
-            if row['result'] != 'draw' and row['result'] is not None:
-                # Si Home gagne, Home Score doit être > Away Score
-                if row['result'] == row['home_team'] and row['home_result'] <= row['away_result']:
-                    issues.append(f"Incohérence L{idx}: {row['home_team']} déclaré gagnant mais score {row['home_result']}-{row['away_result']}")
-                # Si Away gagne, Away Score doit être > Home Score
-                elif row['result'] == row['away_team'] and row['away_result'] <= row['home_result']:
-                    issues.append(f"Incohérence L{idx}: {row['away_team']} déclaré gagnant mais score {row['home_result']}-{row['away_result']}")
-        
+        # 2. Vérification logique (Le gagnant correspond-il au score ?) par masques booléens
+        if not missing:
+            has_result, is_draw, is_home, is_away = self._result_masks(df)
+            home_goals = pd.to_numeric(df['home_result'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            away_goals = pd.to_numeric(df['away_result'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            decided = has_result & ~is_draw
+            # Si Home gagne, Home Score doit être > Away Score
+            bad_home = decided & is_home & (home_goals <= away_goals)
+            # Si Away gagne, Away Score doit être > Home Score (exclusif comme le elif d'origine)
+            bad_away = decided & ~bad_home & is_away & (away_goals <= home_goals)
+            
+            # Messages construits uniquement pour les lignes fautives, dans l'ordre des lignes
+            bad = bad_home | bad_away
+            winners = np.where(bad_home, df['home_team'].to_numpy(dtype=object), df['away_team'].to_numpy(dtype=object))[bad]
+            rows = df.loc[bad, ['home_result', 'away_result']]
+            issues.extend(
+                f"Incohérence L{idx}: {winner} déclaré gagnant mais score {hg}-{ag}"
+                for idx, winner, hg, ag in zip(rows.index, winners, rows['home_result'], rows['away_result'])
+            )
 
         return True
 
-    # Affiche statistiques globales (total matchs, nuls)
+    # Affiche statistiques globales (total matchs, nuls, victoires domicile/extérieur)
     def analyze_results(self, df):
-        draws = df[df['result'] == 'draw']
-        logger.info(f" Analyse: {len(df)} matchs, {len(draws)} nuls.")
\ No newline at end of file
+        # Catégorie par match (0=nul, 1=domicile, 2=extérieur, 3=indéterminé) puis comptage en une passe
+        _, is_draw, is_home, is_away = self._result_masks(df)
+        cat = np.where(is_draw, 0, np.where(is_home, 1, np.where(is_away, 2, 3)))
+        draws, home_wins, away_wins, undetermined = np.bincount(cat, minlength=4)
+        logger.info(f" Analyse: {len(df)} matchs, {draws} nuls, {home_wins} victoires domicile, {away_wins} victoires extérieur.")
+        if undetermined:
+            logger.warning(f" {undetermined} matchs sans résultat exploitable.")
\ No newline at end of file